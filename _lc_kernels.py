@@ -0,0 +1,141 @@
+"""
+Per-value string helpers for fmp_data_munge: formatting roles, authority 
+names, date ranges and authority URIs. They are plain, fully annotated 
+Python with no pandas or pyarrow, so this module can be compiled ahead of 
+time with mypyc for deployment:
+
+    mypyc _lc_kernels.py
+
+Python imports the compiled extension in preference to this file when it is 
+present, and falls back to this file when it is not. The column-level 
+versions used by process_column stay in fmp_data_munge.
+"""
+
+#region IMPORTS
+import logging
+from typing import Final
+#endregion
+
+log = logging.getLogger(__name__)
+
+# Base URIs for each authority in the 'Authority Used' column, see build_uri
+AUTHORITY_BASE_URIS: Final[dict[str, str]] = {
+    'lc': 'http://id.loc.gov/authorities/names/',
+    'viaf': 'http://viaf.org/viaf/'
+}
+
+#region FUNCTIONS
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+
+def get_roles(role_values: str) -> str:
+    """
+    Replace commas with `&&` in the roles string. Outputs values without
+    spaces regardless of input. Also handles cases with `and` and `/`.
+
+    Args:
+        role_values (str): The roles string
+
+    Returns:
+        str: The roles string with commas replaced by `&&`
+
+    Examples:
+        input: 'author, and editor'
+        output: 'author&&editor'
+
+        input: 'author,editor'
+        output: 'author&&editor'
+    """
+
+    values = role_values.replace('/', ',')
+    values = values.replace(', and', ',')
+    values = values.replace(' and ', ',')
+    parts: list[str] = values.split(',')
+    return '&&'.join([part.strip() for part in parts])
+
+def create_authority_name(name: str | None = None, 
+                          date: str | None = None, 
+                          role: str | None = None, 
+                          uri: str | None = None) -> str:
+    """
+    Create an 'authority' name from the name, date, role, and URI
+
+    Example:
+        input: 'Smith, John', '1970', 'author', 'http://id.loc.gov/authorities/names/n79021383'
+        output: 'Smith, John, 1970, author http://id.loc.gov/authorities/names/n79021383'
+    
+    Args:
+        name (str): The name of the person
+        date (str): The date of the person
+        role (str): The role of the person
+        uri (str): The URI of the person
+        
+    Returns:
+        str: The formatted name
+    """
+    log.debug('entering create_authority_name, ``name = %r, date = %r, '
+              'role = %r, uri = %r``', name, date, role, uri)
+    
+    # Join the non-empty parts with plain conditional concatenation rather 
+    # than building and filtering a list on every call
+    role_uri_merge = f'{role} {uri}' if role and uri else role or uri or ''
+    name_date = f'{name}, {date}' if name and date else name or date or ''
+    if name_date and role_uri_merge:
+        return f'{name_date}, {role_uri_merge}'
+    return name_date or role_uri_merge
+
+# The name create_authority_name had when it only built LC names
+create_lc_name = create_authority_name
+
+def create_formatted_date(start_date: str | None, 
+                          end_date: str | None) -> str | None:
+    """
+    Create a date range in 'YYYY - YYYY' format from a start date and an 
+    end date, or a single date if only one is provided
+
+    Args:
+        start_date (str): The start date
+        end_date (str): The end date
+    
+    Returns:
+        str: The formatted date (range)
+    """
+
+    if start_date and end_date:
+        return f'{start_date} - {end_date}'
+    return start_date or end_date or ''
+    
+def build_uri(authority: str | None, id: str | None) -> str | None:
+    """
+    Build a URI from an authority and an ID. The authority can be 'lc', 
+    'viaf', or local. If local or not a known authority, returns None.
+
+    Args:
+        authority (str): The authority
+        id (str): The ID
+
+    Returns:
+        str: The URI
+    """
+
+    if not authority:
+        log.debug('No authority provided: authority = %r, id = %r', 
+                  authority, id)
+        return None
+    authority_lower = authority.lower()
+    if authority_lower == 'local':
+        log.debug('Local authority provided: authority = %r, id = %r', 
+                  authority, id)
+        return None
+    base_uri = AUTHORITY_BASE_URIS.get(authority_lower)
+    if base_uri is None:
+        log.warning('Unknown authority: %s', authority)
+        return None
+    uri = f'{base_uri}{id}'
+    log.debug('Created URI: %s', uri)
+
+    return uri
+
+#endregion
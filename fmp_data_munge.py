@@ -1,19 +1,35 @@
 #region IMPORTS
 import os, sys
+from pathlib import Path
 import argparse
-import csv
 import logging
 from typing import Callable, Optional, Dict, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import json
 import atexit
+import keyword
+from itertools import compress
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from tqdm import tqdm, tqdm_pandas
+from tqdm import tqdm
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 from dotenv import load_dotenv, find_dotenv
 import re
+
+# The per-value string helpers live in _lc_kernels so they can be compiled 
+# with mypyc
+from _lc_kernels import (AUTHORITY_BASE_URIS, get_roles, 
+                         create_authority_name, create_formatted_date, 
+                         build_uri)
 #endregion
 
 # Load environment variables. If no .env exists, use default values
@@ -40,7 +56,7 @@ logging.basicConfig(
     filemode='w'  # Set filemode to 'w' to overwrite the existing log file
 )
 log = logging.getLogger(__name__)
-log.info(f'\n\n`log` logging working, using level, ``{LGLVL}``')
+log.info('\n\n`log` logging working, using level, ``%s``', LGLVL)
 
 ch = logging.StreamHandler()  # ch stands for `Console Handler`
 ch.setLevel(logging.ERROR)  # note: this level is _not_ the same as the file-handler level set in the `.env`
@@ -56,11 +72,12 @@ red_warning = '\033[91mWARNING\033[0m'
 
 #region CLASSES
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FormattedOutput:
     """
     A dataclass 'FormattedOutput' is used to specify how to create a new 
-    column in the process_row function.
+    column in the process_row function. Instances are immutable and use 
+    __slots__ rather than a per-instance __dict__.
 
     Attributes:
         text (str): The static text to include in the new column. 
@@ -95,7 +112,9 @@ class FormattedOutput:
 
 class RateLimiter:
     """
-    A class to rate limit API calls to different domains
+    A class to rate limit API calls to different domains. Safe to share 
+    between threads: each caller reserves the next free slot for its domain 
+    under a lock, then sleeps outside of it.
 
     Attributes:
         rate_limits (Dict[str, float]): A dictionary of rate limits for 
@@ -116,17 +135,20 @@ class RateLimiter:
     def __init__(self, rate_limits):
         self.rate_limits = rate_limits
         self.last_api_call_times = {domain: 0.0 for domain in rate_limits}
+        self.lock = threading.Lock()
 
     def rate_limit_api_call(self, domain):
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call_times[domain]
-        rate_limit = self.rate_limits[domain]
-        if time_since_last_call < rate_limit:
-            rest_time = rate_limit - time_since_last_call
-            log.debug(f'Rate limiting API call to {domain} for {rest_time} '
-                      f'seconds')
+        with self.lock:
+            current_time = time.time()
+            call_time = max(current_time, 
+                            self.last_api_call_times[domain] 
+                            + self.rate_limits[domain])
+            self.last_api_call_times[domain] = call_time
+        rest_time = call_time - current_time
+        if rest_time > 0:
+            log.debug('Rate limiting API call to %s for %s seconds', 
+                      domain, rest_time)
             time.sleep(rest_time)
-        self.last_api_call_times[domain] = time.time()
 
 class LocalCache:
     """
@@ -149,6 +171,8 @@ class LocalCache:
         self.cache_file = cache_file
         self.cache = self.load_cache()
         self.counter = 0
+        # Re-entrant, since set_response saves the cache while holding it
+        self.lock = threading.RLock()
         atexit.register(self.save_cache)
 
     def load_cache(self):
@@ -159,7 +183,7 @@ class LocalCache:
             except json.JSONDecodeError:
                 print(f'''Error loading cache file {self.cache_file},
                       make sure it is a valid JSON file''')
-                log.error(f'Error loading cache file {self.cache_file}')
+                log.error('Error loading cache file %s', self.cache_file)
                 # Ask the user if they want to exit or continue 
                 # without the cache
                 exit = input('Do you want to proceed without the cache? (y/n) ')
@@ -171,31 +195,33 @@ class LocalCache:
 
     def save_cache(self):
         try:
-            with open(self.cache_file, 'w') as f:
+            with self.lock, open(self.cache_file, 'w') as f:
                 json.dump(self.cache, f, indent=4)
         except Exception as e:
-            log.error(f'Error saving cache file {self.cache_file}: {e}')
+            log.error('Error saving cache file %s: %s', self.cache_file, e)
 
     def get_response(self, key):
         return self.cache.get(key, None)
     
     def set_response(self, key, response):
-        self.cache[key] = response
-        self.counter += 1
-        # Save the cache every 10 API calls
-        if self.counter >= 10:
-            log.debug(f'Saving cache after {self.counter} API calls')
-            self.counter = 0
-            self.save_cache()
+        with self.lock:
+            self.cache[key] = response
+            self.counter += 1
+            # Save the cache every 10 API calls
+            if self.counter >= 10:
+                log.debug('Saving cache after %s API calls', self.counter)
+                self.counter = 0
+                self.save_cache()
 
     def write_and_return_response(self, key, response):
         self.set_response(key, response)
         return response
 
     def clear_cache(self):
-        self.cache = {}
-        self.counter = 0 # Reset the counter to 0
-        self.save_cache()
+        with self.lock:
+            self.cache = {}
+            self.counter = 0 # Reset the counter to 0
+            self.save_cache()
 
     def __contains__(self, key):
         return key in self.cache
@@ -220,35 +246,169 @@ class LocalCache:
 # =============================================================================
 
 
-def read_csv(file_path: str) -> pd.DataFrame:
+def get_arrow_csv_options(file_path: str, 
+                          block_size: int = 8 << 20) -> dict[str, Any]:
     """
-    Read a CSV file and return the data as a pandas DataFrame
+    Build the pyarrow.csv options to read a CSV file with every column as a 
+    non-null string, matching pandas with dtype=str and NA detection off. 
+    The header is read first, since pyarrow needs the column names to fix 
+    their types rather than inferring them.
+
+    Args:
+        file_path (str): The path to the CSV file
+        block_size (int): The number of bytes pyarrow parses at a time
+
+    Returns:
+        dict[str, Any]: The read_options, parse_options and convert_options 
+        keyword arguments for pyarrow.csv.read_csv or pyarrow.csv.open_csv
+
+    Raises:
+        ValueError: If the header has blank or duplicate column names, which 
+            pyarrow keeps as they are but pandas renames
+    """
+
+    read_options = pacsv.ReadOptions(use_threads=True, block_size=block_size)
+    # FileMaker exports can have line breaks inside quoted values
+    parse_options = pacsv.ParseOptions(newlines_in_values=True)
+    with pacsv.open_csv(file_path, read_options=read_options, 
+                        parse_options=parse_options) as reader:
+        column_names: list[str] = reader.schema.names
+    if not all(column_names) or len(set(column_names)) < len(column_names):
+        raise ValueError(f'Blank or duplicate column names in {file_path}')
+    convert_options = pacsv.ConvertOptions(
+        column_types={name: pa.string() for name in column_names},
+        strings_can_be_null=False)
+    return {'read_options': read_options, 
+            'parse_options': parse_options, 
+            'convert_options': convert_options}
+
+def read_csv_with_arrow(file_path: str, 
+                        filter_column: str | None, 
+                        filter_values: set[str] | None, 
+                        block_size: int) -> pd.DataFrame:
+    """
+    Read a CSV file with pyarrow's CSV reader, see read_csv. Raises 
+    pyarrow.ArrowInvalid or ValueError for files it cannot read the way 
+    pandas would, such as rows with fewer fields than the header.
+    """
+
+    arrow_options: dict[str, Any] = get_arrow_csv_options(file_path, 
+                                                          block_size)
+    if filter_column and filter_values is not None:
+        # Filter each record batch as it is parsed, so the rows that are not 
+        # kept are never converted to pandas
+        value_set = pa.array(list(filter_values), pa.string())
+        with pacsv.open_csv(file_path, **arrow_options) as reader:
+            table = pa.Table.from_batches(
+                [batch.filter(pc.is_in(batch.column(filter_column), 
+                                       value_set=value_set)) 
+                 for batch in reader], 
+                schema=reader.schema)
+    else:
+        table = pacsv.read_csv(file_path, **arrow_options)
+    return table.to_pandas(
+        types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
+
+def read_csv_with_pandas(file_path: str, 
+                         filter_column: str | None, 
+                         filter_values: set[str] | None, 
+                         chunksize: int) -> pd.DataFrame:
+    """
+    Read a CSV file with pandas' C parser, see read_csv. Short rows are 
+    padded with NA and blank or duplicate column names are renamed, as 
+    pandas does. When filtering, the file is streamed in chunks of 
+    chunksize rows.
+    """
+
+    read_options: dict[str, Any] = {
+        'dtype': 'string[pyarrow]',
+        'engine': 'c',
+        'keep_default_na': False,
+        'na_filter': False,
+    }
+    if filter_column and filter_values is not None:
+        with pd.read_csv(file_path, chunksize=chunksize, 
+                         **read_options) as reader:
+            chunks: list[pd.DataFrame] = [
+                chunk[chunk[filter_column].isin(filter_values)] 
+                for chunk in reader
+                ]
+        return pd.concat(chunks, ignore_index=True)
+    return pd.read_csv(file_path, **read_options)
+
+def read_csv(file_path: str, 
+             filter_column: str | None = None,
+             filter_values: set[str] | None = None,
+             block_size: int = 8 << 20,
+             chunksize: int = 50_000) -> pd.DataFrame:
+    """
+    Read a CSV file and return the data as a pandas DataFrame. Every 
+    column is read as a pyarrow-backed string, so the pipe-separated values 
+    are held in contiguous Arrow buffers and the .str methods run in Arrow's 
+    compute kernels. Empty cells stay empty strings, so the parser can skip 
+    NA detection entirely. The file is parsed directly into Arrow tables by 
+    pyarrow's CSV reader, which splits it into blocks of block_size bytes 
+    and parses them in parallel threads. Files pyarrow cannot read the way 
+    pandas would, such as hand-edited spreadsheets with short rows or 
+    blank column names, fall back to pandas' C parser.
+
+    If filter_column and filter_values are provided, the file is scanned in 
+    blocks with pyarrow's streaming reader (or in chunks of chunksize rows 
+    by pandas) and only the rows whose filter_column value is in 
+    filter_values are kept, so peak memory is bounded by the matching rows 
+    rather than the size of the file.
 
     Args:
         file_path (str): The path to the CSV file
+        filter_column (str): The name of the column to filter rows on
+        filter_values (set[str]): The values of filter_column to keep
+        block_size (int): The number of bytes pyarrow parses at a time
+        chunksize (int): The number of rows pandas reads at a time when 
+            filtering
 
     Returns:
         pd.DataFrame: The data from the CSV file
     """
 
-    df: pd.DataFrame = pd.read_csv(file_path, dtype='string')
-    # df = pd.read_csv(file_path, dtype=str)
-    log.info(f'''Read DataFrame with {len(df)} rows and {len(df.columns)} 
-             columns from {file_path}''')
+    # check that filter_column and filter_values are both provided or 
+    # both None
+    if isinstance(filter_column, str) ^ isinstance(filter_values, set):
+        raise ValueError('Both filter_column and filter_values must be '
+                         'provided')
+
+    try:
+        df: pd.DataFrame = read_csv_with_arrow(file_path, filter_column, 
+                                               filter_values, block_size)
+    except (pa.ArrowInvalid, ValueError) as e:
+        log.warning('pyarrow could not read %s, falling back to the C '
+                    'parser: %s', file_path, e)
+        df = read_csv_with_pandas(file_path, filter_column, filter_values, 
+                                  chunksize)
+    log.info('Read DataFrame with %s rows and %s columns from %s', 
+             len(df), len(df.columns), file_path)
     return df
     
-def write_csv(data: pd.DataFrame, file_path: str):
+def write_csv(data: pd.DataFrame, file_path: str, batch_size: int = 50_000):
     """
     Write a pandas DataFrame to a CSV file, write the index as the 
-    first column
+    first column. The DataFrame is streamed to pyarrow's CSV writer, which 
+    quotes every string value, batch_size rows at a time, so only one batch 
+    of Python string columns is converted to Arrow buffers at once.
 
     Args:
         data (pd.DataFrame): The data to write to the CSV file
         file_path (str): The path to the CSV file
+        batch_size (int): The number of rows to convert and write at a time
     """
 
-    data.to_csv(file_path, index=True)
-    log.info(f'Wrote data to {file_path}')
+    data = data.reset_index()
+    schema: pa.Schema = pa.Schema.from_pandas(data, preserve_index=False)
+    with pacsv.CSVWriter(file_path, schema) as writer:
+        for start in range(0, len(data), batch_size):
+            writer.write_table(pa.Table.from_pandas(
+                data.iloc[start:start + batch_size], schema=schema, 
+                preserve_index=False))
+    log.info('Wrote data to %s', file_path)
 
 def press_c_to_continue():
     """
@@ -275,12 +435,12 @@ def remove_orgs(student_df: pd.DataFrame, orgs_file_path: str) -> pd.DataFrame:
     """
     with open(orgs_file_path, 'r') as f:
         orgs = f.read().splitlines()
-    log.info(f'Read orgs list with {len(orgs)} orgs from {orgs_file_path}')
+    log.info('Read orgs list with %s orgs from %s', len(orgs), orgs_file_path)
 
     # Filter out rows with orgs not in the orgs list
     student_df = student_df[student_df['ss_HH ID'].isin(orgs)]
-    log.info(f'Filtered out orgs not in the orgs list, '
-            f'remaining rows: {len(student_df)}')
+    log.info('Filtered out orgs not in the orgs list, remaining rows: %s', 
+             len(student_df))
 
     return student_df
 
@@ -320,7 +480,8 @@ def clean_student_spreadsheet(df: pd.DataFrame,
     # Print a warning about any rows with null or blank ss_HH ID
     rows_with_null_hh_id = df[df['ss_HH ID'].isnull() | (df['ss_HH ID'] == '')]
     if not rows_with_null_hh_id.empty:
-        log.warning(f'Rows with null or blank ss_HH ID: {rows_with_null_hh_id}')
+        log.warning('Rows with null or blank ss_HH ID: %s', 
+                    rows_with_null_hh_id)
         print(f'{red_warning}: Rows with null or blank HH ID: \n'
               f'{rows_with_null_hh_id}')
         press_c_to_continue()
@@ -328,7 +489,7 @@ def clean_student_spreadsheet(df: pd.DataFrame,
         df = df[~df['ss_HH ID'].isnull() & (df['ss_HH ID'] != '')]
 
     # Replace HH###### with HH_###### for compatibility with FMP data
-    df['ss_HH ID'] = df['ss_HH ID'].map(lambda x: x.replace('HH', 'HH_'))
+    df['ss_HH ID'] = df['ss_HH ID'].str.replace('HH', 'HH_', regex=False)
 
     # Remove rows not specified in the orgs list
     if orgs_file:
@@ -338,20 +499,22 @@ def clean_student_spreadsheet(df: pd.DataFrame,
     df = df.fillna('')
 
     # Strip leading and trailing whitespace from all columns
-    df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+    df = df.assign(**{column: df[column].str.strip() 
+                      for column in df.select_dtypes(['string', 'object'])})
 
     # Print and log a warning about any rows with non-numeric values 
     # in ss_Number of Folders
     non_numeric_folders = df[~df['ss_Number of Folders'].str.isnumeric()]
     if not non_numeric_folders.empty:
-        log.warning(f'Rows with non-numeric ss_Number of Folders: '
-                    f'{len(non_numeric_folders)}')
+        log.warning('Rows with non-numeric ss_Number of Folders: %s', 
+                    len(non_numeric_folders))
         # Use red text to make the warning stand out
         print(f'{red_warning}: Rows with non-numeric Number of Folders:')
-        print(f'HH ID\t\t# of folders')
+        print('HH ID\t\t# of folders')
         if len(non_numeric_folders) <= 10:
-            for i, row in non_numeric_folders.iterrows():
-                print(f'{row["ss_HH ID"]}\t\t{row["ss_Number of Folders"]}')
+            for hh_id, folders in zip(non_numeric_folders['ss_HH ID'], 
+                                      non_numeric_folders['ss_Number of Folders']):
+                print(f'{hh_id}\t\t{folders}')
         else:
             # Separate out the rows with blank values
             blank_folders = (
@@ -360,9 +523,12 @@ def clean_student_spreadsheet(df: pd.DataFrame,
             non_blank_folders = (
                 non_numeric_folders[non_numeric_folders['ss_Number of Folders']
                                      != ''])
-            for i, (_, row) in enumerate(non_blank_folders.iterrows()):
-                print(f'{row["ss_HH ID"]}\t{row["ss_Number of Folders"]}\t'
-                    f'{row["ss_DateText"]}\t{row["ss_Box Numbers"]}')
+            for i, (hh_id, folders, date_text, box_numbers) in enumerate(zip(
+                    non_blank_folders['ss_HH ID'], 
+                    non_blank_folders['ss_Number of Folders'], 
+                    non_blank_folders['ss_DateText'], 
+                    non_blank_folders['ss_Box Numbers'])):
+                print(f'{hh_id}\t{folders}\t{date_text}\t{box_numbers}')
                 if i > 9:
                     print(f'... and {len(non_blank_folders) - 10} '
                           f'more rows with non-numeric values')
@@ -374,12 +540,13 @@ def clean_student_spreadsheet(df: pd.DataFrame,
     # likely a year (4 digits) instead of a number
     likely_years = df[df['ss_Number of Folders'].str.len() >= 4]
     if not likely_years.empty:
-        log.warning(f'Rows with likely years in ss_Number of Folders: '
-                    f'{len(likely_years)}')
+        log.warning('Rows with likely years in ss_Number of Folders: %s', 
+                    len(likely_years))
         print(f'{red_warning}: Rows with likely years in Number of Folders:')
-        print(f'HH ID\t# of folders')
-        for i, row in likely_years.iterrows():
-            print(f'{row["ss_HH ID"]}\t{row["ss_Number of Folders"]}')
+        print('HH ID\t# of folders')
+        for hh_id, folders in zip(likely_years['ss_HH ID'], 
+                                  likely_years['ss_Number of Folders']):
+            print(f'{hh_id}\t{folders}')
         print(f'{red_warning}: These will be included in the sum if left as is')
         press_c_to_continue()
 
@@ -388,12 +555,13 @@ def clean_student_spreadsheet(df: pd.DataFrame,
     likely_dates = df[df['ss_Box Numbers'].str.contains(r'\d{1,2}-\w{3}', 
                                                         na=False)]
     if not likely_dates.empty:
-        log.warning(f'Rows with likely dates in ss_Box Numbers: '
-                    f'{len(likely_dates)}')
+        log.warning('Rows with likely dates in ss_Box Numbers: %s', 
+                    len(likely_dates))
         print(f'{red_warning}: Rows with likely dates in Box Numbers:')
-        print(f'HH ID\tPERMANENT BOX NUMBER(S)')
-        for i, row in likely_dates.iterrows():
-            print(f'{row["ss_HH ID"]}\t{row["ss_Box Numbers"]}')
+        print('HH ID\tPERMANENT BOX NUMBER(S)')
+        for hh_id, box_numbers in zip(likely_dates['ss_HH ID'], 
+                                      likely_dates['ss_Box Numbers']):
+            print(f'{hh_id}\t{box_numbers}')
         print(f'{red_warning}: These will be excluded.')
         press_c_to_continue() 
 
@@ -519,7 +687,7 @@ def compile_box_numbers(col_value: pd.Series) -> str:
         elif re.match(r'^[A-Z]{1,2}-\d{1,3}$', box):
             part_2.append(box)
         elif not re.match(r'^\d{1,2}-\w{3}$', box):
-            log.warning(f'Invalid box number format: {box}')
+            log.warning('Invalid box number format: %s', box)
             print(f'{red_warning}: Invalid box number format: {box}')
     # Sort the box numbers
     part_1.sort()
@@ -536,128 +704,163 @@ def compile_box_numbers(col_value: pd.Series) -> str:
     # Return whichever part is not empty, or an empty string if both are empty
     return part_1_str or part_2_str
 
-def create_start_end_date(row: pd.Series) -> pd.Series:
+def create_start_end_date(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Creates two new columns in the DataFrame, 'Start Date' and 'End Date',
+    Creates two new columns in the DataFrame, 'dateStart' and 'dateEnd',
     based on the 'ss_DateText' column
 
     Args:
-        row (pd.Series): The row to process
+        df (pd.DataFrame): The DataFrame to process
 
     Returns:
-        pd.Series: The processed row
+        pd.DataFrame: The DataFrame with the new columns added
 
     Examples:
         input: ss_DateText='1970-1980'
-        output: Start Date='1970', End Date='1980'
+        output: dateStart='1970', dateEnd='1980'
 
         input: ss_DateText='1970'
-        output: Start Date='1970', End Date='1970'
-    """
-    # Determine if the date is a range or a single date
-    if '-' in row['ss_DateText']:
-        start_date, end_date = row['ss_DateText'].split('-')
-    else:
-        start_date = end_date = row['ss_DateText']
-    row['dateStart'] = start_date
-    row['dateEnd'] = end_date
-    return row
+        output: dateStart='1970', dateEnd='1970'
+    """
+    # Split once for the whole column, a single date is both the start and 
+    # the end
+    date_text: pd.Series = df['ss_DateText']
+    if date_text.empty:
+        # partition returns no columns at all for an empty Series
+        df['dateStart'] = date_text.copy()
+        df['dateEnd'] = date_text.copy()
+        return df
+    parts: pd.DataFrame = date_text.str.partition('-')
+    df['dateStart'] = parts[0]
+    df['dateEnd'] = parts[2].where(parts[1] == '-', date_text)
+    return df
 
-def get_roles(role_values: str) -> str:
+def combine_chunks(array: pa.Array | pa.ChunkedArray) -> pa.Array:
     """
-    Replace commas with `&&` in the roles string. Outputs values without
-    spaces regardless of input. Also handles cases with `and` and `/`.
+    Combine a ChunkedArray into a single contiguous Arrow array, unifying 
+    the dictionaries of a dictionary-encoded one first. Columns read in 
+    blocks, or concatenated, convert to a ChunkedArray with a chunk per 
+    block, while the kernels used here need a single array.
 
     Args:
-        role_values (str): The roles string
+        array (pa.Array | pa.ChunkedArray): The array to combine
 
     Returns:
-        str: The roles string with commas replaced by `&&`
-
-    Examples:
-        input: 'author, and editor'
-        output: 'author&&editor'
-
-        input: 'author,editor'
-        output: 'author&&editor'
+        pa.Array: The combined array, or the array unchanged if it is 
+        already a single array
     """
 
-    values = role_values.replace('/', ',')
-    values = values.replace(', and', ',')
-    values = values.replace(' and ', ',')
-    values = values.split(',')
-    return '&&'.join([value.strip() for value in values])
+    if not isinstance(array, pa.ChunkedArray):
+        return array
+    if pa.types.is_dictionary(array.type):
+        array = array.unify_dictionaries()
+    return array.combine_chunks()
 
-def create_authority_name(**fields) -> str:
+def join_nonempty(parts: list[pa.Array], separator: str) -> pa.Array:
     """
-    Create an 'authority' name from the name, date, role, and URI
+    Join aligned Arrow string arrays element-wise with a separator, leaving 
+    out empty or missing values, the column-level counterpart of 
+    separator.join(filter(None, parts))
 
     Example:
-        input: 'Smith, John', '1970', 'author', 'http://id.loc.gov/authorities/names/n79021383'
-        output: 'Smith, John, 1970, author http://id.loc.gov/authorities/names/n79021383'
-    
+        input: [['a', ''], ['', ''], ['b', 'c']], ', '
+        output: ['a, b', 'c']
+
     Args:
-        name (str): The name of the person
-        date (str): The date of the person
-        role (str): The role of the person
-        uri (str): The URI of the person
-        
+        parts (list[pa.Array]): The arrays to join
+        separator (str): The separator to put between non-empty values
+
     Returns:
-        str: The formatted name
+        pa.Array: The joined values
     """
-    log.debug(f'entering create_authority_name, ``{fields = }``')
-    name = fields.get('name', None)
-    date = fields.get('date', None)
-    role = fields.get('role', None)
-    uri = fields.get('uri', None)
-    
-    role_uri_merge = ' '.join([ i for i in [role, uri] if i])
-    return ', '.join([i for i in [name, date, role_uri_merge] if i])
 
-def create_formatted_date(start_date: str | None, 
-                          end_date: str | None) -> str | None:
+    joined: pa.Array = parts[0].fill_null('')
+    separator_scalar = pa.scalar(separator, joined.type)
+    for part in parts[1:]:
+        part = part.fill_null('')
+        joined = pc.if_else(
+            pc.equal(part, ''), joined,
+            pc.if_else(pc.equal(joined, ''), part,
+                       pc.binary_join_element_wise(joined, part, 
+                                                   separator_scalar)))
+    return joined
+
+def create_authority_names(name: pa.Array | None = None, 
+                           date: pa.Array | None = None, 
+                           role: pa.Array | None = None, 
+                           uri: pa.Array | None = None) -> pa.Array:
     """
-    Create a date range in 'YYYY - YYYY' format from a start date and an 
-    end date, or a single date if only one is provided
+    Column-level version of create_authority_name, taking aligned Arrow 
+    arrays of names, dates, roles and URIs. At least one must be provided.
 
-    Args:
-        start_date (str): The start date
-        end_date (str): The end date
-    
     Returns:
-        str: The formatted date (range)
+        pa.Array: The formatted names
     """
 
-    return ' - '.join([i for i in [start_date, end_date] if i])
-    
-def build_uri(authority: str | None, id: str | None) -> str | None:
-    """
-    Build a URI from an authority and an ID. The authority can be 'lc', 
-    'viaf', or local. If local, returns None.
+    present = [part for part in (name, date, role, uri) if part is not None]
+    length: int = len(present[0])
+    missing = pa.nulls(length, present[0].type)
+    role_uri_merge = join_nonempty([role if role is not None else missing, 
+                                    uri if uri is not None else missing], ' ')
+    return join_nonempty([name if name is not None else missing, 
+                          date if date is not None else missing, 
+                          role_uri_merge], ', ')
 
-    Args:
-        authority (str): The authority
-        id (str): The ID
+def create_formatted_dates(start_date: pa.Array, 
+                           end_date: pa.Array) -> pa.Array:
+    """
+    Column-level version of create_formatted_date, taking aligned Arrow 
+    arrays of start and end dates
 
     Returns:
-        str: The URI
+        pa.Array: The formatted dates (ranges)
     """
 
-    auth_dict = {
-        'lc': 'http://id.loc.gov/authorities/names/',
-        'viaf': 'http://viaf.org/viaf/'
-    }
+    return join_nonempty([start_date, end_date], ' - ')
 
-    if not authority:
-        log.debug(f'No authority provided: {authority = }, {id = }')
-        return None
-    if authority.lower() == 'local':
-        log.debug(f'Local authority provided: {authority = }, {id = }')
-        return None
-    uri = f'{auth_dict[authority.lower()]}{id}'
-    log.debug(f'Created URI: {uri}')
+def build_uris(authority: pa.Array | pa.ChunkedArray, 
+               id: pa.Array | pa.ChunkedArray) -> pa.Array:
+    """
+    Column-level version of build_uri, taking aligned Arrow arrays of 
+    authorities and IDs, either of which may be chunked. The base URI of each distinct authority is looked 
+    up with a single index_in against AUTHORITY_BASE_URIS instead of a dict 
+    lookup per value; local, empty and unknown authorities give a missing 
+    URI.
 
-    return uri
+    Returns:
+        pa.Array: The URIs
+    """
+
+    # Authorities take a handful of distinct values, so dictionary-encode 
+    # them and lowercase and look up each distinct value once; the 
+    # per-value work is then a single integer take
+    encoded: pa.DictionaryArray = pc.dictionary_encode(
+        combine_chunks(authority).fill_null(''))
+    authorities_lower: pa.Array = pc.utf8_lower(encoded.dictionary)
+    string_type: pa.DataType = authorities_lower.type
+    base_uris: pa.Array = pc.take(
+        pa.array(list(AUTHORITY_BASE_URIS.values()), string_type),
+        pc.index_in(authorities_lower, 
+                    value_set=pa.array(list(AUTHORITY_BASE_URIS), 
+                                       string_type)))
+
+    for distinct_authority, authority_lower, base_uri in zip(
+            encoded.dictionary.to_pylist(), authorities_lower.to_pylist(), 
+            base_uris.to_pylist()):
+        if base_uri is None and authority_lower not in ('', 'local'):
+            log.warning('Unknown authority: %s', distinct_authority)
+
+    return pc.binary_join_element_wise(pc.take(base_uris, encoded.indices), 
+                                       combine_chunks(id).cast(string_type), 
+                                       pa.scalar('', string_type))
+
+# Column-level versions of the functions used in FormattedOutput, which 
+# process_column calls on whole arrays instead of once per value
+VECTORIZED_FUNCTIONS: dict[Callable, Callable] = {
+    create_authority_name: create_authority_names,
+    create_formatted_date: create_formatted_dates,
+    build_uri: build_uris,
+}
 
 def reduce_list(values: str, flags: list[bool]) -> str:
     """
@@ -675,8 +878,181 @@ def reduce_list(values: str, flags: list[bool]) -> str:
         str: The reduced list of values
     """
 
-    return '|'.join([value for value, flag in 
-                     zip(values.split('|'), flags) if flag])
+    return '|'.join(compress(values.split('|'), flags))
+
+def get_referenced_columns(output_format: list[FormattedOutput]) -> list[str]:
+    """
+    Get the names of the columns an output_format reads from, either directly 
+    through column_name or as function kwargs, in order of first use
+
+    Args:
+        output_format (list[FormattedOutput]): The output format to inspect
+
+    Returns:
+        list[str]: The referenced column names, without duplicates
+    """
+
+    referenced_columns: list[str] = []
+    for chunk in output_format:
+        if chunk.column_name:
+            referenced_columns.append(chunk.column_name)
+        if chunk.function and chunk.kwargs:
+            referenced_columns.extend(chunk.kwargs.values())
+    return list(dict.fromkeys(referenced_columns))
+
+def validate_output_format(output_format: list[FormattedOutput]):
+    """
+    Check that each FormattedOutput in an output_format specifies both 
+    'function' and 'kwargs' or neither, and that the kwargs names are valid
+
+    Args:
+        output_format (list[FormattedOutput]): The output format to check
+
+    Raises:
+        ValueError: If a FormattedOutput is invalid
+    """
+
+    for chunk in output_format:
+        # check that function and kwargs are both provided or both None
+        if callable(chunk.function) ^ isinstance(chunk.kwargs, dict):
+            raise ValueError("FormattedOutput must specify both "
+                             "'function' and 'kwargs' or neither")
+        for k in (chunk.kwargs or {}):
+            if not k.isidentifier() or keyword.iskeyword(k):
+                raise ValueError(f'Invalid keyword argument name: {k!r}')
+
+def fold_text_chunks(output_format: list[FormattedOutput]
+                     ) -> list[FormattedOutput]:
+    """
+    Fold each text-only FormattedOutput into the text of the chunk after it, 
+    so a run of constant text is added as one string rather than one chunk 
+    at a time. The formatted text is unchanged, since a chunk's text comes 
+    before its column and function.
+
+    Example:
+        input: [text=', '], [text='('], [column_name='Date'], [text=')']
+        output: [text=', (', column_name='Date'], [text=')']
+
+    Args:
+        output_format (list[FormattedOutput]): The output format to fold
+
+    Returns:
+        list[FormattedOutput]: The folded output format
+    """
+
+    folded: list[FormattedOutput] = []
+    for chunk in output_format:
+        if not (chunk.text or chunk.column_name or chunk.function):
+            continue
+        previous: FormattedOutput | None = folded[-1] if folded else None
+        if (previous and previous.column_name is None 
+                and previous.function is None):
+            folded[-1] = replace(chunk, 
+                                 text=previous.text + (chunk.text or ''))
+        else:
+            folded.append(chunk)
+    return folded
+
+def format_value(output_format: list[FormattedOutput], 
+                 values: dict[str, str]) -> str:
+    """
+    Format a single value with an output_format, the per-value counterpart 
+    of the column-level formatting in process_column. A function returning 
+    None adds nothing to the text.
+
+    Args:
+        output_format (list[FormattedOutput]): A list of FormattedOutput 
+            dataclasses specifying how to create the new column
+        values (dict[str, str]): The value of each referenced column at the 
+            position being formatted
+
+    Returns:
+        str: The formatted text
+    """
+
+    text: list[str] = []
+    for chunk in output_format:
+        if chunk.text:
+            text.append(chunk.text)
+        if chunk.column_name:
+            text.append(values[chunk.column_name])
+        if chunk.function:
+            text.append(chunk.function(**{k: values[v] for k, v 
+                                          in chunk.kwargs.items()}) # type: ignore
+                        or '')
+    return ''.join(text)
+
+def compile_row_processor(new_column_name: str, 
+                          output_format: list[FormattedOutput],
+                          mask_column: str | None = None,
+                          mask_value: str | None = None
+                          ) -> Callable[[pd.Series], pd.Series]:
+    """
+    Validate the arguments to process_row once and return a function that 
+    processes a single row with them. Use this instead of process_row when 
+    the same output_format is applied to many rows one at a time.
+
+    Args:
+        new_column_name (str): The name of the column to create
+        output_format (list[FormattedOutput]): A list of FormattedOutput 
+            dataclasses specifying how to create the new column
+        mask_column (str): The name of the column to use as a mask
+        mask_value (str): The value to use as a mask filter, only values 
+            in mask_column matching this value will be 
+            processed (case-insensitive)
+
+    Returns:
+        Callable: A function taking a row and returning the processed row
+
+    Example:
+        ```
+        row_processor = compile_row_processor('namePersonOtherVIAF', 
+                                              output_format, 
+                                              'Authority Used', 'viaf')
+        first_row = row_processor(df.iloc[0])
+        last_row = row_processor(df.iloc[-1])
+        ```
+    """
+
+    # check that mask_column and mask_value are both provided or both None
+    if isinstance(mask_column, str) ^ isinstance(mask_value, str):
+        raise ValueError('Both mask_column and mask_value must be provided')
+
+    validate_output_format(output_format)
+    referenced_columns: list[str] = get_referenced_columns(output_format)
+    output_format = fold_text_chunks(output_format)
+    mask_value_lower: str | None = mask_value.lower() if mask_value else None
+
+    def row_processor(row: pd.Series) -> pd.Series:
+        def split_values(column: str) -> list[str]:
+            return (row[column].split('|') if isinstance(row[column], str) 
+                    else [])
+
+        # track the positions to process based on the mask
+        if mask_column and mask_value_lower:
+            values_to_process: list[bool] = [
+                value.lower() == mask_value_lower 
+                for value in split_values(mask_column)
+                ]
+        elif referenced_columns:
+            values_to_process = [True] * len(
+                split_values(referenced_columns[0]))
+        else:
+            values_to_process = [True]
+
+        # Columns with fewer values than the mask are padded with ''
+        split_columns: dict[str, list[str]] = {
+            column: split_values(column) for column in referenced_columns
+            }
+        row[new_column_name] = '|'.join([
+            format_value(output_format, 
+                         {column: values[i] if i < len(values) else '' 
+                          for column, values in split_columns.items()})
+            for i, value in enumerate(values_to_process) if value
+            ])
+        return row
+
+    return row_processor
 
 def process_row(row: pd.Series,
                 new_column_name: str, 
@@ -687,10 +1063,13 @@ def process_row(row: pd.Series,
 
     """
     Process a row of a DataFrame to create a new column with a format 
-    specified by the FormattedOutput namedtuple
+    specified by the FormattedOutput namedtuple. To process a whole 
+    DataFrame, use process_column, which produces the same values with 
+    column-level operations.
 
     Args:
         row (pd.Series): The row to process
+        new_column_name (str): The name of the column to create
         output_format (list[FormattedOutput]): A list of FormattedOutput 
             namedtuples specifying how to create the new column
         mask_column (str): The name of the column to use as a mask
@@ -723,104 +1102,288 @@ def process_row(row: pd.Series,
 
         This is an example of using the mask_column and mask_value arguments:
         ```
-        new_df = df.apply(process_row, args=(output_format, 
-                            'Authority Used', 'viaf'), axis=1)
+        new_row = process_row(df.iloc[0], 'namePersonOtherVIAF', 
+                              output_format, 'Authority Used', 'viaf')
+        ```
+    """
+
+    log.debug('entering process_row')
+
+    row_processor = compile_row_processor(new_column_name, output_format, 
+                                          mask_column, mask_value)
+    return row_processor(row)
+
+def flatten_piped_column(column: pd.Series) -> tuple[pa.Array, np.ndarray]:
+    """
+    Split a column of pipe-separated values into a flat Arrow array of values 
+    and an array of offsets, so the values of row i are 
+    values[offsets[i]:offsets[i + 1]]. The split runs in Arrow's compute 
+    kernels on the string buffers, without creating Python strings, and on 
+    the categories alone for a categorical column. Missing cells have no 
+    values.
+
+    Example:
+        input: ['a|b', 'c']
+        output: ['a', 'b', 'c'], [0, 2, 3]
+
+    Args:
+        column (pd.Series): The column of pipe-separated values
+
+    Returns:
+        tuple[pa.Array, np.ndarray]: The flat values and the offsets
+    """
+
+    strings: pa.Array = combine_chunks(pa.array(column, from_pandas=True))
+    if pa.types.is_dictionary(strings.type):
+        # Categorical column, split each distinct cell once and gather the 
+        # split values by code
+        split: pa.Array = pc.take(
+            pc.split_pattern(strings.dictionary.cast(pa.large_string()), 
+                             pattern='|'), 
+            strings.indices)
+    else:
+        split = pc.split_pattern(strings.cast(pa.large_string()), 
+                                 pattern='|')
+    lengths: np.ndarray = pc.list_value_length(split).fill_null(0).to_numpy()
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return pc.list_flatten(split), offsets
+
+def take_piped_values(values: pa.Array, 
+                      offsets: np.ndarray, 
+                      rows: np.ndarray, 
+                      positions: np.ndarray
+                      ) -> pa.Array:
+    """
+    Take the value at each (row, position) pair from a flattened column, 
+    using '' where a row has fewer values than the position
+
+    Args:
+        values (pa.Array): The flat values from flatten_piped_column
+        offsets (np.ndarray): The offsets from flatten_piped_column
+        rows (np.ndarray): The row of each value to take
+        positions (np.ndarray): The position within its row of each value
+
+    Returns:
+        pa.Array: The values taken
+    """
+
+    missing: np.ndarray = positions >= np.diff(offsets)[rows]
+    indices = pa.array(np.where(missing, 0, offsets[rows] + positions), 
+                       mask=missing)
+    return pc.take(values, indices).fill_null('')
+
+def map_unique(function: Callable, 
+               kwargs: dict[str, np.ndarray], 
+               progress_bar: bool = False,
+               max_workers: int = 1
+               ) -> np.ndarray:
+    """
+    Call a function once for each unique combination of keyword argument 
+    values and map the results back onto every combination. The calls are 
+    independent of each other, so with max_workers > 1 they are made 
+    concurrently from a thread pool, which pays off when the function waits 
+    on an API (see build_uri_dict).
+
+    Args:
+        function (Callable): The function to call
+        kwargs (dict[str, np.ndarray]): The keyword arguments, as aligned 
+            arrays of values, at least one
+        progress_bar (bool): Show a tqdm progress bar over the calls
+        max_workers (int): The number of threads making the calls
+
+    Returns:
+        np.ndarray: The result of the function for each set of values
+    """
+
+    # Factorize the argument arrays into a code per value and the unique 
+    # argument combinations, without building a tuple or dict per value
+    keys: tuple[str, ...] = tuple(kwargs)
+    factorized: list[tuple[np.ndarray, np.ndarray]] = [
+        pd.factorize(values) for values in kwargs.values()
+        ]
+    unique_codes, codes = np.unique(
+        np.stack([value_codes for value_codes, _ in factorized], axis=1), 
+        axis=0, return_inverse=True)
+    records: list[dict[str, Any]] = [
+        {key: uniques[code] for key, (_, uniques), code 
+         in zip(keys, factorized, combination)}
+        for combination in unique_codes
+        ]
+
+    results = np.empty(len(records), dtype=object)
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            calls = executor.map(lambda record: function(**record), records)
+            if progress_bar:
+                calls = tqdm(calls, total=len(records))
+            results[:] = list(calls)
+    else:
+        results[:] = [function(**record) for record in 
+                      (tqdm(records) if progress_bar else records)]
+    return results[codes.reshape(-1)]
+
+def process_column(df: pd.DataFrame,
+                   new_column_name: str,
+                   output_format: list[FormattedOutput],
+                   mask_column: str | None = None,
+                   mask_value: str | None = None,
+                   progress_bar: bool = False,
+                   max_workers: int = 1
+                   ) -> pd.DataFrame:
+    """
+    Process a whole DataFrame to create a new column with a format
+    specified by the FormattedOutput dataclass. Produces the same values as
+    applying process_row to every row, but with column-level operations: 
+    every referenced column is flattened once into an Arrow array of 
+    pipe-separated values and row offsets, the chunks are concatenated 
+    across the aligned values, and the results are joined back into one 
+    pipe-separated string per row, all in Arrow's compute kernels. Functions 
+    are called once per unique combination of arguments rather than once per 
+    value, so they should not depend on anything but their arguments, and 
+    should return a str or None. Functions with a column-level version in 
+    VECTORIZED_FUNCTIONS are called once on the whole arrays instead.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to process
+        new_column_name (str): The name of the column to create
+        output_format (list[FormattedOutput]): A list of FormattedOutput
+            dataclasses specifying how to create the new column
+        mask_column (str): The name of the column to use as a mask
+        mask_value (str): The value to use as a mask filter, only values
+            in mask_column matching this value will be
+            processed (case-insensitive)
+        progress_bar (bool): Show a tqdm progress bar while calling the 
+            functions in output_format that are in IO_BOUND_FUNCTIONS
+        max_workers (int): The number of threads calling the functions in 
+            output_format that are in IO_BOUND_FUNCTIONS, see map_unique; 
+            other functions are called serially
+
+    Returns:
+        pd.DataFrame: The DataFrame with the new column added
+
+    Example:
+        ```
+        new_df = process_column(df, 'namePersonOtherVIAF', output_format,
+                                'Authority Used', 'viaf')
         ```
     """
 
-    log.debug(f'entering process_row')
+    log.debug('entering process_column, ``new_column_name = %r``', 
+              new_column_name)
 
     # check that mask_column and mask_value are both provided or both None
     if isinstance(mask_column, str) ^ isinstance(mask_value, str):
         raise ValueError('Both mask_column and mask_value must be provided')
-    
-    # track the indices to process based on the mask
+
+    validate_output_format(output_format)
+    referenced_columns: list[str] = get_referenced_columns(output_format)
+    output_format = fold_text_chunks(output_format)
+
+    # the (row, position) of each value to process based on the mask
     if mask_column and mask_value:
-        log.debug(f'{mask_column = }, {mask_value = }')
-        values_to_process = ([True if i.lower() == mask_value.lower() 
-                              else False for i in 
-                              str(row[mask_column]).split('|')] if 
-                              pd.notna(row[mask_column]) else [False])
-        log.debug(f'{values_to_process = }')
+        mask_values, mask_offsets = flatten_piped_column(df[mask_column])
+        # compare each distinct mask value once, then map onto every value
+        encoded: pa.DictionaryArray = pc.dictionary_encode(mask_values)
+        selected: np.ndarray = pc.take(
+            pc.equal(pc.utf8_lower(encoded.dictionary), mask_value.lower()),
+            encoded.indices).to_numpy(zero_copy_only=False)
+    elif referenced_columns:
+        mask_values, mask_offsets = flatten_piped_column(
+            df[referenced_columns[0]])
+        selected = np.ones(len(mask_values), dtype=bool)
     else:
-        values_to_process = [True] * len(row)
-        log.debug(f'No mask provided, processing all values: '
-                  f'{values_to_process = }')
-
-    formatted_output_values: list[str] = []
-
-    for i, value in enumerate(values_to_process):
-        if value:
-            formatted_text: str = ''
-            for chunk in output_format:
-                # check that function and kwargs are both provided or both None
-                if callable(chunk.function) ^ isinstance(chunk.kwargs, dict):
-                    raise ValueError("FormattedOutput must specify both "
-                                     "'function' and 'kwargs' or neither")
-                if chunk.text:
-                    formatted_text += chunk.text
-                if chunk.column_name:
-                    formatted_text += row[chunk.column_name].split('|')[i]
-                if chunk.function:
-                    built_kwargs: dict = {}
-                    for k, v in chunk.kwargs.items(): # type: ignore
-                        built_kwargs[k] = row[v].split('|')[i]
-                    formatted_text += chunk.function(**built_kwargs)
-            formatted_output_values.append(formatted_text)
-
-    row[new_column_name] = '|'.join(formatted_output_values)
-    log.debug(f'Processed row: {row}')
-    return row
-
-def add_nameCorpCreatorLocal_column(row: pd.Series) -> pd.Series:
-    """
-    Process a row of a DataFrame to create a new column, 
-    populating it with the 'Organization Name' from the 'sources' sheet if 
-    neither 'LCNAF' nor 'VIAF' names are found.
+        mask_offsets = np.arange(len(df) + 1, dtype=np.int64)
+        selected = np.ones(len(df), dtype=bool)
+    lengths: np.ndarray = np.diff(mask_offsets)
+    rows: np.ndarray = np.repeat(np.arange(len(df)), lengths)[selected]
+    positions: np.ndarray = (np.arange(mask_offsets[-1]) 
+                             - np.repeat(mask_offsets[:-1], lengths))[selected]
+
+    # Split each referenced column once, aligned on the values to process
+    values: dict[str, pa.Array] = {
+        column: take_piped_values(*flatten_piped_column(df[column]), 
+                                  rows, positions)
+        for column in referenced_columns
+        }
+
+    pieces: list[pa.Array | pa.Scalar] = [
+        pa.nulls(len(rows), pa.large_string()).fill_null('')
+        ]
+    for chunk in output_format:
+        if chunk.text:
+            pieces.append(pa.scalar(chunk.text, pa.large_string()))
+        if chunk.column_name:
+            pieces.append(values[chunk.column_name])
+        if chunk.function in VECTORIZED_FUNCTIONS:
+            results = VECTORIZED_FUNCTIONS[chunk.function](
+                **{k: values[v] for k, v in chunk.kwargs.items()}) # type: ignore
+            pieces.append(results.fill_null(''))
+        elif chunk.function:
+            io_bound: bool = chunk.function in IO_BOUND_FUNCTIONS
+            results = map_unique(chunk.function, 
+                                 {k: values[v].to_numpy(zero_copy_only=False)
+                                  for k, v in chunk.kwargs.items()}, # type: ignore
+                                 progress_bar and io_bound, 
+                                 max_workers if io_bound else 1)
+            pieces.append(pa.array(results, type=pa.large_string(), 
+                                   from_pandas=True).fill_null(''))
+    formatted: pa.Array = pc.binary_join_element_wise(
+        *pieces, pa.scalar('', pa.large_string()))
+
+    # Join the formatted values of each row, walking the row offsets
+    row_offsets: np.ndarray = np.searchsorted(rows, np.arange(len(df) + 1))
+    joined: pa.Array = pc.binary_join(
+        pa.ListArray.from_arrays(pa.array(row_offsets, type=pa.int32()), 
+                                 formatted), 
+        pa.scalar('|', pa.large_string()))
+    df[new_column_name] = pd.arrays.ArrowStringArray(joined)
+    log.debug('Processed column: %s', new_column_name)
+    return df
+
+def add_nameCorpCreatorLocal_column(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Create the nameCorpCreatorLocal column of a DataFrame, populating it 
+    with the 'Organization Name' from the 'sources' sheet if neither 'LCNAF' 
+    nor 'VIAF' names are found.
 
     Args:
-        row (pd.Series): The row to process
+        df (pd.DataFrame): The DataFrame to process
 
     Returns:
-        pd.Series: The processed row
+        pd.DataFrame: The DataFrame with the new column added
     """
 
-    log.debug(f'entering add_nameCorpCreatorLocal_column')
+    log.debug('entering add_nameCorpCreatorLocal_column')
 
-    # check if 'nameCorpCreatorLC' is empty
-    if row['nameCorpCreatorLC']:
-        log.debug(f'nameCorpCreatorLC is not empty, returning row')
-        row['nameCorpCreatorLocal'] = ''
-        return row
-    
-    # check if 'namePersonCreatorLC' is empty
-    if row['namePersonCreatorLC']:
-        log.debug(f'namePersonCreatorLC is not empty, returning row')
-        row['nameCorpCreatorLocal'] = ''
-        return row
-    
-    # check if 'nameCorpCreatorVIAF' is empty
-    if row['nameCorpCreatorVIAF']:
-        log.debug(f'nameCorpCreatorVIAF is not empty, returning row')
-        row['nameCorpCreatorLocal'] = ''
-        return row
-    
-    # Try to pull the first value from 'Organization Name_sources'
-    sources_name = row['Organization Name_sources'].split('|')[0]
-    if sources_name:
-        row['nameCorpCreatorLocal'] = sources_name
-        return row
-    log.debug(f'No Organization Name found in Organization Name_sources, '
-              f'attempting to pull from Organization Name_subjects')
-    subjects_name = row['Organization Name_subjects'].split('|')[0]
-    if subjects_name:
-        row['nameCorpCreatorLocal'] = subjects_name
-    else:
-        row['nameCorpCreatorLocal'] = ''
-        log.warning(f'No Organization Name found for row: {row}')
+    # Pull the columns out as object arrays once, iterating an Arrow-backed 
+    # Series directly converts every value separately
+    columns: list[np.ndarray] = [
+        df.index.to_numpy(dtype=object),
+        *(df[column].to_numpy(dtype=object) for column in 
+          ['nameCorpCreatorLC', 'namePersonCreatorLC', 'nameCorpCreatorVIAF', 
+           'Organization Name_sources', 'Organization Name_subjects'])
+        ]
 
-    log.debug(f'Processed row: {row}')
-    return row
+    # Preallocate the new column, rows with another name stay blank
+    local_names: np.ndarray = np.full(len(df), '', dtype=object)
+    for i, (org_id, corp_lc, person_lc, corp_viaf, sources_names, 
+            subjects_names) in enumerate(zip(*columns)):
+        # check if 'nameCorpCreatorLC', 'namePersonCreatorLC' or 
+        # 'nameCorpCreatorVIAF' are populated
+        if corp_lc or person_lc or corp_viaf:
+            continue
+
+        # Try to pull the first value from 'Organization Name_sources', 
+        # then from 'Organization Name_subjects'
+        local_name = (sources_names.split('|')[0] 
+                      or subjects_names.split('|')[0])
+        if not local_name:
+            log.warning('No Organization Name found for %s', org_id)
+        local_names[i] = local_name
+
+    df['nameCorpCreatorLocal'] = local_names
+    return df
 
 # MARK: API CALLS
 
@@ -835,6 +1398,32 @@ lc_subject_cache = LocalCache('lc_subject_cache.json')
 lc_name_type_cache = LocalCache('lc_name_type_cache.json')
 viaf_name_cache = LocalCache('viaf_name_cache.json')
 
+def create_api_session() -> requests.Session:
+    """
+    Create a requests Session whose connection pool is shared across the 
+    calls to one API, so concurrent lookups reuse TCP/TLS connections 
+    instead of opening a new one per request. Transient errors are retried 
+    with backoff.
+
+    Returns:
+        requests.Session: The session to make the API calls with
+    """
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                          max_retries=Retry(total=3, backoff_factor=0.3,
+                                            status_forcelist=[429, 500, 502, 
+                                                              503, 504]))
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Every call has a (connect, read) timeout so a stalled request can't hang 
+# the whole run
+lc_timeout = (3, 10)
+lc_session = create_api_session()
+viaf_timeout = (3, 10)
+viaf_session = create_api_session()
+
 def lc_get_subject_uri(subject_term: str) -> str | None:
     """
     Call the Library of Congress API to get the URI for a subject term
@@ -845,7 +1434,7 @@ def lc_get_subject_uri(subject_term: str) -> str | None:
     Returns:
         str: The URI of the subject term or None if not found
     """
-    log.debug(f'entering lc_get_subject_uri')
+    log.debug('entering lc_get_subject_uri')
 
     # Check the local cache
     if subject_term in lc_subject_cache:
@@ -863,16 +1452,17 @@ def lc_get_subject_uri(subject_term: str) -> str | None:
         subject_term_correct_case = subject_term
 
     if subject_term != subject_term_correct_case:
-        log.debug(f'Correcting case for {subject_term} to '
-                  f'{subject_term_correct_case} for API call')
+        log.debug('Correcting case for %s to %s for API call', 
+                  subject_term, subject_term_correct_case)
 
     try:
-        response = requests.head(
+        response = lc_session.head(
             f'https://id.loc.gov/authorities/subjects/label/'
-            f'{subject_term_correct_case}', allow_redirects=True
+            f'{subject_term_correct_case}', allow_redirects=True, 
+            timeout=lc_timeout
             )
     except requests.exceptions.RequestException as e:
-        log.error(f'Error with request: {e}')
+        log.error('Error with request: %s', e)
         return None
     if response.ok:
         return lc_subject_cache.write_and_return_response(
@@ -880,7 +1470,7 @@ def lc_get_subject_uri(subject_term: str) -> str | None:
             )
     
     if response.status_code == 404:
-        log.debug(f'No URI found for {subject_term}')
+        log.debug('No URI found for %s', subject_term)
         lc_subject_cache[subject_term] = 'NOT_FOUND'
 
     return None
@@ -896,7 +1486,7 @@ def lc_get_name_type(uri: str) -> str | None:
     Returns:
         str: The type of the name or None if not found
     """
-    log.debug(f'entering lc_get_name_type')
+    log.debug('entering lc_get_name_type')
 
     # Check the local cache
     if uri in lc_name_type_cache:
@@ -907,13 +1497,17 @@ def lc_get_name_type(uri: str) -> str | None:
     # Limit the rate of API calls if necessary
     rate_limiter.rate_limit_api_call('lc')
 
-    response = requests.get(f'{uri}.json')
+    try:
+        response = lc_session.get(f'{uri}.json', timeout=lc_timeout)
+    except requests.exceptions.RequestException as e:
+        log.error('Error with request: %s', e)
+        return None
     if response.ok:
-        log.debug(f'LC API call successful')
+        log.debug('LC API call successful')
         try:
             data: list[dict[str, Any]] = response.json()
         except Exception as e:
-            log.warning(f'Error parsing JSON: {e}')
+            log.warning('Error parsing JSON: %s', e)
             raise
         # find the dictionary with a key of '@id' and a value of the uri
         try:
@@ -921,14 +1515,14 @@ def lc_get_name_type(uri: str) -> str | None:
                                           if d.get('@id', None) == uri][0]
                                           )
         except IndexError:
-            log.warning(f'No matching dictionary found for {uri}')
+            log.warning('No matching dictionary found for %s', uri)
             return None
-        log.debug(f'{matching_dict = }')
+        log.debug('matching_dict = %r', matching_dict)
         # get the values from the '@type' key
         name_types: list[str] = matching_dict.get('@type', None)
-        log.debug(f'{name_types = }')
+        log.debug('name_types = %r', name_types)
         if not name_types:
-            log.warning(f'No name types found for {uri}')
+            log.warning('No name types found for %s', uri)
             return None
         if "http://www.loc.gov/mads/rdf/v1#CorporateName" in name_types:
             return lc_name_type_cache.write_and_return_response(uri, 
@@ -937,11 +1531,11 @@ def lc_get_name_type(uri: str) -> str | None:
             return lc_name_type_cache.write_and_return_response(uri, 
                                                                 'Personal')
     else:
-        log.warning(f'LC API call failed for ```{uri}```, '
-                    f'{response.status_code = }')
+        log.warning('LC API call failed for ```%s```, '
+                    'response.status_code = %r', uri, response.status_code)
 
     if response.status_code == 404:
-        log.warning(f'No name found for {uri}')
+        log.warning('No name found for %s', uri)
         lc_name_type_cache[uri] = 'NOT_FOUND'
         
     return None
@@ -956,7 +1550,7 @@ def get_viaf_name(uri: str) -> str:
     Returns:
         str: The name of the person or organization or 'NOT_FOUND' if not found
     """
-    log.debug(f'entering get_viaf_name')
+    log.debug('entering get_viaf_name')
 
     # Check the local cache
     if uri in viaf_name_cache:
@@ -967,10 +1561,14 @@ def get_viaf_name(uri: str) -> str:
     # Limit the rate of API calls if necessary
     rate_limiter.rate_limit_api_call('viaf')
 
-    response = requests.get(f'{uri}/viaf.json')
+    try:
+        response = viaf_session.get(f'{uri}/viaf.json', timeout=viaf_timeout)
+    except requests.exceptions.RequestException as e:
+        log.error('Error with request: %s', e)
+        return 'NOT_FOUND'
 
     if not response.ok:
-        log.warning(f'Error with {uri}')
+        log.warning('Error with %s', uri)
         return viaf_name_cache.write_and_return_response(uri, 'NOT_FOUND')
 
     # Parse the JSON response
@@ -979,7 +1577,7 @@ def get_viaf_name(uri: str) -> str:
         try:
             redirect_id = response_json['redirect']['directto']
         except KeyError:
-            log.warning(f'Problem following redirect for {uri}')
+            log.warning('Problem following redirect for %s', uri)
             return viaf_name_cache.write_and_return_response(uri, 'NOT_FOUND')
         redirect_uri = f'http://viaf.org/viaf/{redirect_id}'
         return viaf_name_cache.write_and_return_response(
@@ -996,7 +1594,7 @@ def get_viaf_name(uri: str) -> str:
         try:
             sources = d.get('sources', None)
         except AttributeError:
-            log.warning(f'Error with {uri}')
+            log.warning('Error with %s', uri)
             raise
         if 'LC' in sources['s']:
             name = d.get('text', None)
@@ -1005,13 +1603,18 @@ def get_viaf_name(uri: str) -> str:
                 name = name.replace('....', '')
                 return viaf_name_cache.write_and_return_response(uri, name)
             
-    log.warning(f'Unable to find name for ``{uri}``')
+    log.warning('Unable to find name for ``%s``', uri)
     return viaf_name_cache.write_and_return_response(uri, 'NOT_FOUND')
 
+# Functions that wait on an API, which process_column calls from a thread 
+# pool and with a progress bar
+IO_BOUND_FUNCTIONS: set[Callable] = {get_viaf_name}
+
 def get_unique_values_from_column(column: pd.Series) -> set[str]:
     """
     Get unique values from a column of a DataFrame, separating 
-    pipe-separated values
+    pipe-separated values. The split, flatten and dedupe all run as Arrow 
+    compute kernels; only the unique values become Python strings.
 
     Args:
         column (pd.Series): The column to process
@@ -1020,134 +1623,123 @@ def get_unique_values_from_column(column: pd.Series) -> set[str]:
         set[str]: The unique values
     """
     
-    unique_values: set[str] = set()
-    for value in column:
-        unique_values.update(value.split('|'))
-    return unique_values
+    values = pc.split_pattern(pa.array(column), pattern='|')
+    return set(pc.unique(pc.list_flatten(values)).to_pylist())
 
-def build_uri_dict(values: set[str], api_call: Callable) -> dict[str, str]:
+def build_uri_dict(values: set[str], api_call: Callable, 
+                   max_workers: int = 16) -> dict[str, str]:
     """
-    Build a dictionary of URIs from a set of values using an API call
+    Build a dictionary of URIs (or other API results, such as LC name 
+    types) from a set of values using an API call. Values the API call 
+    returns nothing for are left out. The calls are made concurrently from 
+    a thread pool; api_call is expected to do its own rate limiting 
+    (see RateLimiter).
 
     Args:
         values (set[str]): The values to search for
         api_call (Callable): The function to call to get the URI for a value
+        max_workers (int): The number of threads making API calls
 
     Returns:
         dict[str, str]: The dictionary of values and URIs
     """
     
     uri_dict: dict[str, str] = {}
-    for value in tqdm(values):
-        uri = api_call(value)
-        if uri:
-            uri_dict[value] = uri
-        # time.sleep(0.2)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(api_call, value): value 
+                   for value in values}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            uri = future.result()
+            if uri:
+                uri_dict[futures[future]] = uri
     return uri_dict
 
-def add_subjectTopics(row: pd.Series, uri_dict: dict[str, str]) -> pd.Series:
+def add_subjectTopics(df: pd.DataFrame, 
+                      uri_dict: dict[str, str]) -> pd.DataFrame:
     """
-    Process a row of a DataFrame to populate either subjectTopicsLC or 
-    subjectTopicsLocal columns. Populates subjectTopicsLC if an LC URI 
+    Populate the subjectTopicsLC and subjectTopicsLocal columns of a 
+    DataFrame. Each subject term goes to subjectTopicsLC if an LC URI 
     is found, subjectTopicsLocal if not.
 
     Args:
-        row (pd.Series): The row to process
+        df (pd.DataFrame): The DataFrame to process
+        uri_dict (dict[str, str]): The subject terms and their LC URIs
 
     Returns:
-        pd.Series: The processed row
+        pd.DataFrame: The DataFrame with the new columns added
     """
 
-    log.debug(f'entering add_subjectTopics')
+    log.debug('entering add_subjectTopics')
 
-    # Create list of subject terms from pipe-separated values 
-    # in 'Subject Heading'
-    subject_terms: list[str] = row['Subject Heading'].split('|')
-
-    # Iterate through subject terms to find URIs
-    uri_terms: list[str] = []
-    local_terms: list[str] = []
-    for term in subject_terms:
-        uri = uri_dict.get(term, None)
-        if uri:
-            uri_terms.append(f'{term} {uri}')
-        else:
-            local_terms.append(term)
-    if not uri_terms:
-        uri_terms = ['']
-    if not local_terms:
-        local_terms = ['']
+    # Create lists of subject terms from pipe-separated values 
+    # in 'Subject Heading', once for the whole column
+    subject_terms: pd.Series = df['Subject Heading'].str.split('|')
 
     # Concatenate URIs and local terms
-    row['subjectTopicsLC'] = '|'.join(uri_terms)
-    row['subjectTopicsLocal'] = '|'.join(local_terms)
-
-    log.debug(f'Processed row: {row}')
-    return row
+    df['subjectTopicsLC'] = ['|'.join([f'{term} {uri_dict[term]}' 
+                                       for term in terms if term in uri_dict])
+                             for terms in subject_terms]
+    df['subjectTopicsLocal'] = ['|'.join([term for term in terms 
+                                          if term not in uri_dict])
+                                for terms in subject_terms]
+
+    log.debug('Processed column: subjectTopicsLC, subjectTopicsLocal')
+    return df
 
-def make_name_type_column(row: pd.Series, 
+def make_name_type_column(df: pd.DataFrame, 
                           uri_column: str, 
                           authority_column: str
-                          ) -> pd.Series:
+                          ) -> pd.DataFrame:
     """
-    Process a row of a DataFrame to create a new column,
-    populating it with either 'Personal' or 'Corporate' 
-    based on an LC API call.
+    Create the 'Name Type' column of a DataFrame, populating it with either 
+    'Personal' or 'Corporate' based on an LC API call for the first LCNAF 
+    URI in each row. Each unique URI is only looked up once, and the 
+    lookups are made concurrently (see build_uri_dict).
 
     Args:
-        row (pd.Series): The row to process
+        df (pd.DataFrame): The DataFrame to process
+        uri_column (str): The name of the pipe-separated URI column
+        authority_column (str): The name of the pipe-separated authority 
+            column, matching uri_column value for value
 
     Returns:
-        pd.Series: The processed row
+        pd.DataFrame: The DataFrame with the new column added
     """
 
-    log.debug(f'entering make_name_type_column')
+    log.debug('entering make_name_type_column')
 
-    # Get authority and URI values
-    authorities: list[str] = row[authority_column].split('|')
-    if 'LCNAF' not in authorities:
-        row['Name Type'] = ''
-        return row
-    uris: list[str] = row[uri_column].split('|')
-
-    # Find first LC URI
-    uri: str | None = None
-    for i, authority in enumerate(authorities):
-        if authority == 'LCNAF':
-            uri = uris[i]
-            break
-
-    # Get name type
-    if not uri:
-        row['Name Type'] = ''
-        return row
-    name_type: str | None = lc_get_name_type(uri)
-    if not name_type:
-        name_type = ''
-    row['Name Type'] = name_type
+    # Find the first LC URI of each row, or None if it has no LCNAF 
+    # authority
+    lc_uris: list[str | None] = [
+        uris[authorities.index('LCNAF')] if 'LCNAF' in authorities else None
+        for authorities, uris in zip(df[authority_column].str.split('|'), 
+                                     df[uri_column].str.split('|'))
+        ]
+
+    # Get name types, looking up the unique URIs concurrently
+    unique_uris: set[str] = {uri for uri in lc_uris if uri}
+    name_types: dict[str, str] = build_uri_dict(unique_uris, 
+                                                lc_get_name_type)
+    df['Name Type'] = [name_types.get(uri, '') if uri else '' 
+                       for uri in lc_uris]
 
-    log.debug(f'Processed row: {row}')
-    return row
+    log.debug('Processed column: Name Type')
+    return df
 
-def handle_person_and_corp_lc_names(row: pd.Series) -> pd.Series:
+def handle_person_and_corp_lc_names(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Creates the namePersonCreatorLC and nameCorpCreatorLC columns by 
-    handing off to process_row based on the value in the 'Name Type' column.
+    Creates the namePersonCreatorLC and nameCorpCreatorLC columns. The LC 
+    name is built once for every row with process_column, then kept in 
+    one column or the other based on the value in the 'Name Type' column.
 
     Args:
-        row (pd.Series): The row to process
+        df (pd.DataFrame): The DataFrame to process
 
     Returns:
-        pd.Series: The processed row
+        pd.DataFrame: The DataFrame with the new columns added
     """
     
-    log.debug(f'entering handle_person_and_corp_lc_names')
-
-    # Check if 'Name Type' is empty
-    if not row['Name Type']:
-        row['namePersonCreatorLC'] = ''
-        row['nameCorpCreatorLC'] = ''
-        return row
+    log.debug('entering handle_person_and_corp_lc_names')
 
     output_format: list[FormattedOutput] = [
         FormattedOutput(text=None, column_name='Organization Name_sources', 
@@ -1157,23 +1749,47 @@ def handle_person_and_corp_lc_names(row: pd.Series) -> pd.Series:
         FormattedOutput(text=None, column_name='URI', function=None, 
                         kwargs=None)
     ]
+    df = process_column(df, 'namePersonCreatorLC', output_format, 
+                        'Source', 'LCNAF')
+
+    # Keep the name in the column matching its 'Name Type', blank otherwise
+    df['nameCorpCreatorLC'] = df['namePersonCreatorLC'].where(
+        df['Name Type'] == 'Corporate', '')
+    df['namePersonCreatorLC'] = df['namePersonCreatorLC'].where(
+        df['Name Type'] == 'Personal', '')
+    return df
 
-    # Check if 'Name Type' is 'Personal'
-    if row['Name Type'] == 'Personal':
-        row = process_row(row, 'namePersonCreatorLC', output_format, 
-                          'Source', 'LCNAF')
-        row['nameCorpCreatorLC'] = ''
-        return row
+def add_nameCorpCreatorVIAF_column(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Create the nameCorpCreatorVIAF column from the VIAF sources of each 
+    row, kept only for rows with neither a namePersonCreatorLC nor a 
+    nameCorpCreatorLC name (see handle_person_and_corp_lc_names).
 
-    # Check if 'Name Type' is 'Corporate'
-    if row['Name Type'] == 'Corporate':
-        row = process_row(row, 'nameCorpCreatorLC', output_format, 
-                          'Source', 'LCNAF')
-        row['namePersonCreatorLC'] = ''
-        return row
+    Args:
+        df (pd.DataFrame): The DataFrame to process
+
+    Returns:
+        pd.DataFrame: The DataFrame with the new column added
+    """
+
+    log.debug('entering add_nameCorpCreatorVIAF_column')
 
-    log.debug(f'Processed row: {row}')
-    return row
+    output_format: list[FormattedOutput] = [
+        FormattedOutput(text=None, column_name='Organization Name_sources', 
+                        function=None, kwargs=None),
+        FormattedOutput(text=' ', column_name=None, function=None, 
+                        kwargs=None),
+        FormattedOutput(text=None, column_name='URI', function=None, 
+                        kwargs=None)
+    ]
+    df = process_column(df, 'nameCorpCreatorVIAF', output_format, 
+                        'Source', 'VIAF')
+
+    # We only want to keep the nameCorpCreatorVIAF column if the 
+    # nameCorpCreatorLC and namePersonCreatorLC columns are empty
+    df.loc[(df['nameCorpCreatorLC'] != '') 
+           | (df['namePersonCreatorLC'] != ''), 'nameCorpCreatorVIAF'] = ''
+    return df
 
 #endregion    
         
@@ -1193,13 +1809,9 @@ def main():
                         'not provided, all organizations will be included.',
                         default=None)
     args = parser.parse_args()
-    log.info(f'successfully parsed args, ``{args}``')
-
-    # Set up tqdm.pandas() to use progress_apply
-    tqdm.pandas()
+    log.info('successfully parsed args, ``%s``', args)
 
-    # Read the CSV files
-    fmp_df: pd.DataFrame = read_csv(args.fmp_file)
+    # Read the student spreadsheet
     student_df: pd.DataFrame = read_csv(args.student_file)
 
     print('\n\n\n')
@@ -1220,7 +1832,12 @@ def main():
                   aggregate(aggregation_functions).reset_index())
 
     # Create the 'Start Date' and 'End Date' columns
-    student_df = student_df.apply(create_start_end_date, axis=1)
+    student_df = create_start_end_date(student_df)
+
+    # Read the FMP data, streaming it in chunks and keeping only the 
+    # organizations in the student spreadsheet
+    fmp_df: pd.DataFrame = read_csv(args.fmp_file, 'Organization ID', 
+                                    set(student_df['ss_HH ID']))
 
     # Perform a left join on the student data with the FMP data
     # ie. keep all rows from the student data and only matching rows from the 
@@ -1243,6 +1860,12 @@ def main():
     # Convert NA values to empty strings
     df = df.fillna('')
 
+    # These columns repeat a small vocabulary of authorities and roles, so 
+    # store each distinct cell once; process_column splits only the 
+    # categories
+    for column in ['Authority Used', 'Position']:
+        df[column] = df[column].astype('category')
+
     print('\033[92m' + 'Finished merging FMP data with student spreadsheet'
            + '\033[0m')
     print('\n')
@@ -1250,7 +1873,7 @@ def main():
           + '\033[0m')
 
     # Add the namePersonOtherVIAF column MARK: namePersonOtherVIAF
-    log.debug(f'Adding the namePersonOtherVIAF column')
+    log.debug('Adding the namePersonOtherVIAF column')
     print('Adding the namePersonOtherVIAF column. This could take a while as '
           'it requires an API call for each new VIAF URI.')
     output_format: list[FormattedOutput] = [
@@ -1266,16 +1889,14 @@ def main():
                         kwargs={'authority': 'Authority Used', 
                                 'id': 'Authority ID'})
     ]
-    new_df: pd.DataFrame = df.progress_apply(process_row, 
-                                             args=('namePersonOtherVIAF', 
-                                                   output_format, 
-                                                   'Authority Used', 
-                                                   'viaf'), 
-                                             axis=1) # type: ignore
+    new_df: pd.DataFrame = process_column(df, 'namePersonOtherVIAF', 
+                                          output_format, 'Authority Used', 
+                                          'viaf', progress_bar=True, 
+                                          max_workers=16)
     print('Finished adding the namePersonOtherVIAF column')
 
     # Add the namePersonOtherLocal column MARK: namePersonOtherLocal
-    log.debug(f'Adding the namePersonOtherLocal column')
+    log.debug('Adding the namePersonOtherLocal column')
     print('Adding the namePersonOtherLocal column.') 
     output_format: list[FormattedOutput] = [
         FormattedOutput(text=None, column_name='Authoritized Name', 
@@ -1285,51 +1906,26 @@ def main():
         FormattedOutput(text=None, column_name=None, function=get_roles, 
                         kwargs={'role_values': 'Position'}),
     ]
-    new_df: pd.DataFrame = new_df.apply(process_row, 
-                                        args=('namePersonOtherLocal', 
-                                              output_format, 
-                                              'Authority Used', 'local'), 
-                                              axis=1)
+    new_df: pd.DataFrame = process_column(new_df, 'namePersonOtherLocal', 
+                                          output_format, 'Authority Used', 
+                                          'local')
 
     # Make the nameType column
     print('Adding the (temporary) Name Type column. This could take a while '
           'as it requires an API call for each new LCNAF URI.')
-    new_df: pd.DataFrame = new_df.progress_apply(make_name_type_column, 
-                                                 args=('URI', 'Source'), 
-                                                 axis=1) # type: ignore
+    new_df: pd.DataFrame = make_name_type_column(new_df, 'URI', 'Source')
     print('Finished adding the Name Type column')
 
     # Add the namePersonCreatorLC and nameCorpCreatorLC columns MARK: namePersonCreatorLC, nameCorpCreatorLC
     print('Adding the namePersonCreatorLC and nameCorpCreatorLC columns')
-    new_df: pd.DataFrame = new_df.apply(handle_person_and_corp_lc_names, axis=1)
+    new_df: pd.DataFrame = handle_person_and_corp_lc_names(new_df)
 
     # Add the nameCorpCreatorVIAF column MARK: nameCorpCreatorVIAF
     """
     If no LCNAF, find name, Pull only VIAF URIs, ignore all others
     """
     print('Adding the nameCorpCreatorVIAF column.')
-    output_format: list[FormattedOutput] = [
-        FormattedOutput(text=None, column_name='Organization Name_sources', 
-                        function=None, kwargs=None),
-        FormattedOutput(text=' ', column_name=None, function=None, 
-                        kwargs=None),
-        FormattedOutput(text=None, column_name='URI', function=None, 
-                        kwargs=None)
-    ]
-    new_df: pd.DataFrame = new_df.apply(process_row, 
-                                        args=('nameCorpCreatorVIAF', 
-                                              output_format, 'Source', 'VIAF'),
-                                                axis=1)
-
-    # We only want to keep the nameCorpCreatorVIAF column if the 
-    # nameCorpCreatorLC and namePersonCreatorLC columns are empty
-    new_df['nameCorpCreatorVIAF'] = new_df.apply(
-        lambda row: row['nameCorpCreatorVIAF'] 
-        if not row['nameCorpCreatorLC'] 
-        and not row['namePersonCreatorLC'] 
-        else '', 
-        axis=1
-        )
+    new_df: pd.DataFrame = add_nameCorpCreatorVIAF_column(new_df)
 
     # Add the nameCorpCreatorLocal column MARK: nameCorpCreatorLocal
     """
@@ -1342,15 +1938,14 @@ def main():
         Ex: The Presbyterian Journal
     """
     print('Adding the nameCorpCreatorLocal column.')
-    new_df: pd.DataFrame = new_df.apply(add_nameCorpCreatorLocal_column, axis=1)
+    new_df: pd.DataFrame = add_nameCorpCreatorLocal_column(new_df)
 
     # Add the subjectTopicsLC and subjectTopicsLocal columns MARK: subjectTopicsLC, subjectTopicsLocal
     print('Adding subjectTopicsLC and subjectTopicsLocal columns '
           '(hitting LC API for each new unique subject term)')
     unique_subjects = get_unique_values_from_column(new_df['Subject Heading'])
     uri_dict = build_uri_dict(unique_subjects, lc_get_subject_uri)
-    new_df: pd.DataFrame = new_df.apply(add_subjectTopics, args=(uri_dict,), 
-                                        axis=1)
+    new_df: pd.DataFrame = add_subjectTopics(new_df, uri_dict)
     print('Finished adding subjectTopicsLC and subjectTopicsLocal columns')
 
     # Add subjectNamesLC MARK: subjectNamesLC
@@ -1384,10 +1979,8 @@ def main():
     new_df.drop('Name Type', axis=1, inplace=True)
 
     # print(new_df.head())
-    log.info(f'Finished processing DataFrame, writing to CSV')
-    output_dir = os.path.dirname(args.output_file)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    log.info('Finished processing DataFrame, writing to CSV')
+    Path(args.output_file).parent.mkdir(parents=True, exist_ok=True)
     write_csv(new_df, args.output_file)
     print('\033[92m' + 'Done!' + '\033[0m')
 
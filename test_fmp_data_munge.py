@@ -1,5 +1,12 @@
+import ast
+import os
+import tempfile
 import unittest
-from fmp_data_munge import create_lc_name
+from unittest import mock
+import pandas as pd
+import pyarrow as pa
+import fmp_data_munge
+from _lc_kernels import create_lc_name
 
 class TestMunger(unittest.TestCase):
 
@@ -33,6 +40,438 @@ class TestMunger(unittest.TestCase):
             result = create_lc_name(name, date, role, uri)
             self.assertEqual(expected, result)
 
+    def test_create_start_end_date(self):
+        """
+        Checks that create_start_end_date splits a date range, and uses a 
+        single date as both the start and the end
+        """
+        df = pd.DataFrame({'ss_DateText': ['1970-1980', '1970', '']}, 
+                          dtype='string[pyarrow]')
+        df = fmp_data_munge.create_start_end_date(df)
+        self.assertEqual(['1970', '1970', ''], df['dateStart'].tolist())
+        self.assertEqual(['1980', '1970', ''], df['dateEnd'].tolist())
+
+    def test_create_start_end_date__empty_frame(self):
+        """
+        Checks that create_start_end_date adds empty date columns to an 
+        empty frame
+        """
+        df = pd.DataFrame({'ss_DateText': []}, dtype='string[pyarrow]')
+        df = fmp_data_munge.create_start_end_date(df)
+        self.assertEqual(['ss_DateText', 'dateStart', 'dateEnd'], 
+                         df.columns.tolist())
+        self.assertEqual(0, len(df))
+
+    def test_module__no_row_wise_pandas_calls(self):
+        """
+        Checks that fmp_data_munge does not call the row-wise pandas methods 
+        (apply, applymap, iterrows, itertuples), which build a Series or 
+        tuple for every row instead of working on whole columns
+        """
+        with open(fmp_data_munge.__file__) as f:
+            tree = ast.parse(f.read())
+        row_wise_methods = {'apply', 'applymap', 'iterrows', 'itertuples'}
+        row_wise_calls = [f'line {node.lineno}: .{node.func.attr}()' 
+                          for node in ast.walk(tree) 
+                          if isinstance(node, ast.Call) 
+                          and isinstance(node.func, ast.Attribute) 
+                          and node.func.attr in row_wise_methods]
+        self.assertEqual([], row_wise_calls)
+
+def shout(value):
+    """
+    An output_format function that upper-cases a value, or returns None for 
+    an empty one
+    """
+    return value.upper() or None
+
+class TestProcessColumn(unittest.TestCase):
+
+    def setUp(self):
+        FormattedOutput = fmp_data_munge.FormattedOutput
+        self.output_format = [
+            FormattedOutput(text=None, column_name='Name', function=None, 
+                            kwargs=None),
+            FormattedOutput(text=', ', column_name=None, function=None, 
+                            kwargs=None),
+            FormattedOutput(text=None, column_name=None, 
+                            function=fmp_data_munge.get_roles, 
+                            kwargs={'role_values': 'Position'}),
+            FormattedOutput(text=' ', column_name=None, 
+                            function=fmp_data_munge.build_uri, 
+                            kwargs={'authority': 'Authority Used', 
+                                    'id': 'Authority ID'}),
+            FormattedOutput(text=' ', column_name=None, function=shout, 
+                            kwargs={'value': 'Name'}),
+        ]
+        self.df = pd.DataFrame({
+            'Name': ['Ann|Bob', 'Cy', '', 'Dee|Eve|Fay'],
+            'Position': ['author, and editor|editor', 'printer', '', 'a|b'],
+            'Authority Used': ['LC|local', 'VIAF', '', 'viaf|XYZ|lc'],
+            'Authority ID': ['n1|', 'v2', '', 'v3|x4|n5'],
+            }, dtype='string[pyarrow]')
+
+    def assert_matches_process_row(self, df, expected, mask_column=None, 
+                                   mask_value=None):
+        result = fmp_data_munge.process_column(df.copy(), 'New', 
+                                               self.output_format, 
+                                               mask_column, mask_value)
+        self.assertEqual(expected, result['New'].tolist())
+        self.assertEqual(pd.StringDtype('pyarrow'), result['New'].dtype)
+        rows = [fmp_data_munge.process_row(df.iloc[i].copy(), 'New', 
+                                           self.output_format, 
+                                           mask_column, mask_value)['New'] 
+                for i in range(len(df))]
+        self.assertEqual(expected, rows)
+        row_processor = fmp_data_munge.compile_row_processor(
+            'New', self.output_format, mask_column, mask_value)
+        rows = [row_processor(df.iloc[i].copy())['New'] 
+                for i in range(len(df))]
+        self.assertEqual(expected, rows)
+
+    def test_process_column__unmasked(self):
+        """
+        Checks that process_column formats every value, padding columns 
+        with fewer values than the first referenced column with ''
+        """
+        self.assert_matches_process_row(self.df, [
+            'Ann, author&&editor http://id.loc.gov/authorities/names/n1 ANN'
+            '|Bob, editor  BOB',
+            'Cy, printer http://viaf.org/viaf/v2 CY',
+            ',   ',
+            'Dee, a http://viaf.org/viaf/v3 DEE|Eve, b  EVE'
+            '|Fay,  http://id.loc.gov/authorities/names/n5 FAY',
+            ])
+
+    def test_process_column__masked(self):
+        """
+        Checks that process_column only formats the values whose mask 
+        column value matches the mask value, case-insensitively
+        """
+        self.assert_matches_process_row(self.df, [
+            '', 
+            'Cy, printer http://viaf.org/viaf/v2 CY', 
+            '', 
+            'Dee, a http://viaf.org/viaf/v3 DEE',
+            ], 'Authority Used', 'viaf')
+
+    def test_process_column__categorical_mask_column(self):
+        """
+        Checks that process_column gives the same result for a categorical 
+        mask column
+        """
+        df = self.df.astype({'Authority Used': 'category'})
+        self.assert_matches_process_row(df, [
+            'Ann, author&&editor http://id.loc.gov/authorities/names/n1 ANN',
+            '', 
+            '', 
+            'Fay,  http://id.loc.gov/authorities/names/n5 FAY',
+            ], 'Authority Used', 'lc')
+
+    def test_process_column__no_selection(self):
+        """
+        Checks that process_column gives '' for every row when no value 
+        matches the mask value
+        """
+        self.assert_matches_process_row(self.df, ['', '', '', ''], 
+                                        'Authority Used', 'none')
+
+    def test_process_column__unknown_authority(self):
+        """
+        Checks that build_uri adds nothing for an authority it does not know
+        """
+        self.assert_matches_process_row(self.df, ['', '', '', 'Eve, b  EVE'], 
+                                        'Authority Used', 'xyz')
+
+    def test_process_column__empty_frame(self):
+        """
+        Checks that process_column adds an empty column to an empty frame
+        """
+        self.assert_matches_process_row(self.df.iloc[:0], [], 
+                                        'Authority Used', 'viaf')
+        self.assert_matches_process_row(self.df.iloc[:0], [])
+
+    def test_fold_text_chunks(self):
+        """
+        Checks that fold_text_chunks folds runs of text-only chunks into 
+        the chunk after them without changing the formatted text
+        """
+        FormattedOutput = fmp_data_munge.FormattedOutput
+        output_format = [
+            FormattedOutput(text=None, column_name='Name', function=None, 
+                            kwargs=None),
+            FormattedOutput(text=', ', column_name=None, function=None, 
+                            kwargs=None),
+            FormattedOutput(text='(', column_name=None, function=None, 
+                            kwargs=None),
+            FormattedOutput(text=None, column_name=None, function=shout, 
+                            kwargs={'value': 'Position'}),
+            FormattedOutput(text=')', column_name=None, function=None, 
+                            kwargs=None),
+            FormattedOutput(text='.', column_name=None, function=None, 
+                            kwargs=None),
+        ]
+        folded = fmp_data_munge.fold_text_chunks(output_format)
+        self.assertEqual([
+            FormattedOutput(text=None, column_name='Name', function=None, 
+                            kwargs=None),
+            FormattedOutput(text=', (', column_name=None, function=shout, 
+                            kwargs={'value': 'Position'}),
+            FormattedOutput(text=').', column_name=None, function=None, 
+                            kwargs=None),
+            ], folded)
+        values = {'Name': 'Ann', 'Position': 'author'}
+        self.assertEqual('Ann, (AUTHOR).', 
+                         fmp_data_munge.format_value(folded, values))
+        self.assertEqual('Ann, (AUTHOR).', 
+                         fmp_data_munge.format_value(output_format, values))
+
+    def test_process_column__multi_chunk_frame(self):
+        """
+        Checks that process_column handles columns read in several blocks, 
+        which convert to Arrow as a ChunkedArray with a chunk per block
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                f.write('Name,Position,Authority Used,Authority ID\n')
+                for i in range(3000):
+                    f.write(f'Name {i}|Other {i},author|editor,'
+                            f'VIAF|local,v{i}|\n')
+            df = fmp_data_munge.read_csv(file_path, block_size=4096)
+        self.assertGreater(pa.array(df['Name']).num_chunks, 1)
+
+        result = fmp_data_munge.process_column(df, 'New', self.output_format, 
+                                               'Authority Used', 'viaf')
+        self.assertEqual([f'Name {i}, author http://viaf.org/viaf/v{i} '
+                          f'NAME {i}' for i in range(3000)], 
+                         result['New'].tolist())
+
+    def test_process_column__missing_values(self):
+        """
+        Checks that a missing value is treated as having no values
+        """
+        df = self.df.copy()
+        df.loc[1, 'Position'] = pd.NA
+        df.loc[3, 'Authority Used'] = pd.NA
+        self.assert_matches_process_row(df, [
+            '', 'Cy,  http://viaf.org/viaf/v2 CY', '', ''
+            ], 'Authority Used', 'viaf')
+
+class TestCreatorColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Source': ['LCNAF', 'LCNAF|VIAF', 'VIAF', 'LCNAF', 'local'],
+            'URI': ['n1', 'n2|v2', 'v3', 'n4', ''],
+            'Organization Name_sources': ['Org A', 'Org B|Org B2', 'Org C', 
+                                          'Org D|Org D2', ''],
+            'Organization Name_subjects': ['', '', '', 'Subj D', 
+                                           'Subj E|Subj E2'],
+            'Name Type': ['Personal', 'Corporate', '', '', ''],
+            }, dtype='string[pyarrow]')
+
+    def test_handle_person_and_corp_lc_names(self):
+        """
+        Checks that the LC name goes to namePersonCreatorLC or 
+        nameCorpCreatorLC by Name Type, and to neither without one
+        """
+        df = fmp_data_munge.handle_person_and_corp_lc_names(self.df)
+        self.assertEqual(['Org A n1', '', '', '', ''], 
+                         df['namePersonCreatorLC'].tolist())
+        self.assertEqual(['', 'Org B n2', '', '', ''], 
+                         df['nameCorpCreatorLC'].tolist())
+
+    def test_add_nameCorpCreatorVIAF_column(self):
+        """
+        Checks that nameCorpCreatorVIAF is built from the VIAF sources and 
+        blanked for rows with an LC name
+        """
+        df = fmp_data_munge.handle_person_and_corp_lc_names(self.df)
+        df = fmp_data_munge.add_nameCorpCreatorVIAF_column(df)
+        self.assertEqual(['', '', 'Org C v3', '', ''], 
+                         df['nameCorpCreatorVIAF'].tolist())
+
+    def test_add_nameCorpCreatorLocal_column(self):
+        """
+        Checks that nameCorpCreatorLocal takes the first Organization 
+        Name_sources, falling back to the first Organization Name_subjects, 
+        only for rows without an LC or VIAF name
+        """
+        df = fmp_data_munge.handle_person_and_corp_lc_names(self.df)
+        df = fmp_data_munge.add_nameCorpCreatorVIAF_column(df)
+        df = fmp_data_munge.add_nameCorpCreatorLocal_column(df)
+        self.assertEqual(['', '', '', 'Org D', 'Subj E'], 
+                         df['nameCorpCreatorLocal'].tolist())
+
+class TestLcColumns(unittest.TestCase):
+
+    def test_make_name_type_column(self):
+        """
+        Checks that Name Type comes from the first LCNAF URI of each row, 
+        looking each unique URI up once, and is empty without an LCNAF URI 
+        or a name type
+        """
+        df = pd.DataFrame({
+            'Source': ['VIAF|LCNAF', 'LCNAF', 'VIAF', 'LCNAF', 'LCNAF|LCNAF'],
+            'URI': ['v1|n1', 'n2', 'v3', 'n3', 'n2|n1'],
+            }, dtype='string[pyarrow]')
+        name_types = {'n1': 'Personal', 'n2': 'Corporate'}
+        with mock.patch.object(fmp_data_munge, 'lc_get_name_type', 
+                               side_effect=name_types.get) as lookup:
+            df = fmp_data_munge.make_name_type_column(df, 'URI', 'Source')
+        self.assertEqual(['Personal', 'Corporate', '', '', 'Corporate'], 
+                         df['Name Type'].tolist())
+        self.assertEqual({'n1', 'n2', 'n3'}, 
+                         {call.args[0] for call in lookup.call_args_list})
+        self.assertEqual(3, lookup.call_count)
+
+    def test_add_subjectTopics(self):
+        """
+        Checks that each subject term goes to subjectTopicsLC with its URI 
+        if LC has one, and to subjectTopicsLocal if not
+        """
+        df = pd.DataFrame({
+            'Subject Heading': ['Women|Local Topic', 'Poetry', 'Other', ''],
+            }, dtype='string[pyarrow]')
+        subject_uris = {'Women': 'sh1', 'Poetry': 'sh2'}
+        with mock.patch.object(fmp_data_munge, 'lc_get_subject_uri', 
+                               side_effect=subject_uris.get):
+            unique_subjects = fmp_data_munge.get_unique_values_from_column(
+                df['Subject Heading'])
+            uri_dict = fmp_data_munge.build_uri_dict(
+                unique_subjects, fmp_data_munge.lc_get_subject_uri)
+        self.assertEqual(subject_uris, uri_dict)
+        df = fmp_data_munge.add_subjectTopics(df, uri_dict)
+        self.assertEqual(['Women sh1', 'Poetry sh2', '', ''], 
+                         df['subjectTopicsLC'].tolist())
+        self.assertEqual(['Local Topic', '', 'Other', ''], 
+                         df['subjectTopicsLocal'].tolist())
+
+class TestReadCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write_csv_file(self, text: str) -> str:
+        file_path = os.path.join(self.temp_dir.name, 'data.csv')
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        return file_path
+
+    def assert_string_columns(self, df):
+        for column in df.columns:
+            self.assertEqual(pd.StringDtype('pyarrow'), df[column].dtype)
+            self.assertFalse(df[column].isna().any())
+
+    def test_read_csv__unfiltered(self):
+        """
+        Checks that read_csv reads every column as a non-null string, 
+        keeping empty cells and 'NA' as they are
+        """
+        file_path = self.write_csv_file('id,a,b\n1,x,\n2,NA,y\n')
+        df = fmp_data_munge.read_csv(file_path)
+        self.assert_string_columns(df)
+        self.assertEqual([['1', 'x', ''], ['2', 'NA', 'y']], 
+                         df.values.tolist())
+
+    def test_read_csv__ragged_rows(self):
+        """
+        Checks that read_csv pads rows with fewer fields than the header 
+        instead of failing, as pandas does
+        """
+        file_path = self.write_csv_file('id,a,b\n1,x,y\n2,z\n')
+        df = fmp_data_munge.read_csv(file_path)
+        self.assertEqual(['id', 'a', 'b'], df.columns.tolist())
+        self.assertEqual([['1', 'x', 'y'], ['2', 'z', '']], 
+                         df.fillna('').values.tolist())
+
+    def test_read_csv__filtered(self):
+        """
+        Checks that a filtered read_csv returns exactly the rows whose 
+        filter column value is in the filter values, as non-null strings, 
+        including a quoted value with a line break, and that the frame, 
+        read in several blocks, goes through process_column and build_uris
+        """
+        filler = ''.join(f'HH_x{i},Org X{i},,VIAF,{i}\n' for i in range(500))
+        file_path = self.write_csv_file(
+            'id,name,notes,Authority Used,Authority ID\n'
+            + filler
+            + 'HH_1,Org A,,local,\n'
+            + filler
+            + 'HH_2,Org B,"first line\nsecond line",VIAF,v2\n'
+            + 'HH_3,Org C,other,VIAF,v3\n'
+            'HH_22,Org D,not HH_2,VIAF,v22\n')
+        df = fmp_data_munge.read_csv(file_path, 'id', {'HH_2', 'HH_1'}, 
+                                     block_size=4096)
+        self.assert_string_columns(df)
+        self.assertEqual([['HH_1', 'Org A', '', 'local', ''], 
+                          ['HH_2', 'Org B', 'first line\nsecond line', 
+                           'VIAF', 'v2']], 
+                         df.values.tolist())
+        self.assertGreater(pa.array(df['Authority Used']).num_chunks, 1)
+
+        FormattedOutput = fmp_data_munge.FormattedOutput
+        output_format = [
+            FormattedOutput(text=None, column_name='name', function=None, 
+                            kwargs=None),
+            FormattedOutput(text=' ', column_name=None, 
+                            function=fmp_data_munge.build_uri, 
+                            kwargs={'authority': 'Authority Used', 
+                                    'id': 'Authority ID'}),
+        ]
+        df = fmp_data_munge.process_column(df, 'New', output_format, 
+                                           'Authority Used', 'viaf')
+        self.assertEqual(['', 'Org B http://viaf.org/viaf/v2'], 
+                         df['New'].tolist())
+        uris = fmp_data_munge.build_uris(pa.array(df['Authority Used']), 
+                                         pa.array(df['Authority ID']))
+        self.assertEqual([None, 'http://viaf.org/viaf/v2'], 
+                         uris.to_pylist())
+
+    def test_read_csv__filtered_ragged_rows(self):
+        """
+        Checks that a filtered read_csv pads rows with fewer fields than the 
+        header instead of failing, as pandas does
+        """
+        file_path = self.write_csv_file(
+            'id,name,notes\nHH_1,Org A\nHH_2,Org B,note\nHH_3,Org C,x\n')
+        df = fmp_data_munge.read_csv(file_path, 'id', {'HH_1', 'HH_2'}, 
+                                     chunksize=1)
+        self.assertEqual([['HH_1', 'Org A', ''], ['HH_2', 'Org B', 'note']], 
+                         df.fillna('').values.tolist())
+
+    def test_write_csv__batches(self):
+        """
+        Checks that write_csv writes every batch of a frame larger than 
+        batch_size, with the index as the first column and a categorical 
+        column written as its values
+        """
+        df = pd.DataFrame({
+            'Organization ID': [f'HH_{i}' for i in range(120)],
+            'Name': [f'Org "{i}", Inc.' for i in range(120)],
+            'Authority Used': pd.Categorical(
+                ['VIAF|local', 'LC', ''] * 40),
+            }).set_index('Organization ID')
+        file_path = os.path.join(self.temp_dir.name, 'out.csv')
+        fmp_data_munge.write_csv(df, file_path, batch_size=50)
+        result = fmp_data_munge.read_csv(file_path)
+        self.assertEqual(['Organization ID', 'Name', 'Authority Used'], 
+                         result.columns.tolist())
+        self.assertEqual(df.reset_index().astype(str).values.tolist(), 
+                         result.values.tolist())
+
+    def test_read_csv__blank_and_duplicate_column_names(self):
+        """
+        Checks that read_csv renames blank and duplicate column names the 
+        way pandas does
+        """
+        file_path = self.write_csv_file('id,,,a,a\n1,2,3,4,5\n')
+        df = fmp_data_munge.read_csv(file_path)
+        self.assertEqual(['id', 'Unnamed: 1', 'Unnamed: 2', 'a', 'a.1'], 
+                         df.columns.tolist())
+
 
 if __name__ == '__main__':
     unittest.main()